@@ -1,5 +1,5 @@
 # Databricks notebook source
-# MAGIC %pip install pytest
+# MAGIC %pip install pytest pytest-json-report pytest-xdist
 
 # COMMAND ----------
 
@@ -26,30 +26,25 @@ test_add()  # Will raise error if the assertion fails
 # COMMAND ----------
 
 # MAGIC %%sh
-# MAGIC mkdir -p /dbfs/tmp/pytest_framework/src
-# MAGIC mkdir -p /dbfs/tmp/pytest_framework/tests
+# MAGIC # Copy pytest.ini, src/ and tests/ from workspace to local disk in a single streaming pass.
+# MAGIC # The copy is saved as a script and starts from an empty directory, so tests deleted in the
+# MAGIC # workspace disappear too; every pytest cell below re-runs it to test the current code
+# MAGIC cat > /tmp/sync_pytest_framework.sh <<'EOF'
+# MAGIC rm -rf /tmp/pytest_framework && mkdir -p /tmp/pytest_framework
+# MAGIC tar -cf - --exclude='__pycache__' pytest.ini src tests | tar -xf - -C /tmp/pytest_framework/
+# MAGIC EOF
+# MAGIC sh /tmp/sync_pytest_framework.sh
 
 # COMMAND ----------
 
 # MAGIC %%sh
-# MAGIC # Copy your files from workspace to DBFS
-# MAGIC cp src/my_module.py /dbfs/tmp/pytest_framework/src/
-# MAGIC cp tests/test_my_module.py /dbfs/tmp/pytest_framework/tests/
-
-# COMMAND ----------
-
-# MAGIC %%sh
-# MAGIC cp tests/* /dbfs/tmp/pytest_framework/tests/
-
-# COMMAND ----------
-
-# MAGIC %%sh
-# MAGIC ls -lh /dbfs/tmp/pytest_framework/tests/
+# MAGIC ls -lh /tmp/pytest_framework/tests/
 
 # COMMAND ----------
 
 # MAGIC %sh
-# MAGIC pytest /dbfs/tmp/pytest_framework/tests/
+# MAGIC sh /tmp/sync_pytest_framework.sh
+# MAGIC pytest /tmp/pytest_framework/tests/
 
 # COMMAND ----------
 
@@ -59,44 +54,82 @@ test_add()  # Will raise error if the assertion fails
 
 # COMMAND ----------
 
-import pytest
 import os
-
-test_dir = "/dbfs/tmp/pytest_framework/tests/"
-test_files = [os.path.join(test_dir, "test_my_module.py"), os.path.join(test_dir, "test_date.py")]
+import subprocess
+import sys
+
+# Tests run from local disk; pytest.ini here limits collection to tests/
+PYTEST_ROOT = "/tmp/pytest_framework"
+# The notebook's own directory, holding the pytest.ini, src/ and tests/ being edited
+WORKSPACE_DIR = os.getcwd()
+
+def sync_workspace():
+    """Refresh PYTEST_ROOT from the workspace with the script written by the copy cell"""
+    subprocess.run(["sh", "/tmp/sync_pytest_framework.sh"], cwd=WORKSPACE_DIR, check=True)
+
+def run_pytest(args):
+    """Refresh the local copy, then run pytest on it in a fresh interpreter so no module is cached between runs"""
+    sync_workspace()
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q"] + args, cwd=PYTEST_ROOT, capture_output=True, text=True, check=False
+    )
+    print(result.stdout, result.stderr)
+    return result.returncode
+
+def publish_report(local_path):
+    """Copy a report written on local disk to the same path on DBFS in one shot"""
+    dbutils.fs.cp(f"file:{local_path}", f"dbfs:{local_path}")
+
+# COMMAND ----------
+
+# Collect every test once and cache the node IDs; later cells run explicit node IDs
+# instead of re-collecting. Re-run this cell after adding or renaming tests.
+sync_workspace()
+collection = subprocess.run(
+    [sys.executable, "-m", "pytest", "-q", "--collect-only", "tests"],
+    cwd=PYTEST_ROOT, capture_output=True, text=True, check=False
+)
+NODE_IDS = [line for line in collection.stdout.splitlines() if "::" in line]
+
+def node_ids_for(*file_names):
+    """
+    Cached node IDs of the tests defined in the given test files. A file with no cached IDs
+    (added or renamed since collection, or failing to collect) is passed as tests/<file>, so
+    pytest runs or reports just that file instead of falling back to the whole tests/ tree
+    """
+    node_ids = []
+    for file_name in file_names:
+        cached = [node_id for node_id in NODE_IDS if node_id.split("::")[0].rsplit("/", 1)[-1] == file_name]
+        node_ids += cached or [f"tests/{file_name}"]
+    return node_ids
+
+# COMMAND ----------
+
+test_files = node_ids_for("test_my_module.py", "test_date.py")
 
 # print(test_files)
 
 # Run pytest and generate a report
-pytest.main(["--junitxml=/dbfs/tmp/pytest_results.xml"] + test_files)
+run_pytest(["-n", "auto", "--dist=loadfile", "--junitxml=/tmp/pytest_results.xml"] + test_files)
+publish_report("/tmp/pytest_results.xml")
 
 # COMMAND ----------
 
 # MAGIC %%sh
-# MAGIC cat /dbfs/tmp/pytest_results.xml
+# MAGIC cat /tmp/pytest_results.xml
 
 # COMMAND ----------
 
-# MAGIC %pip install pytest-json-report
-
-# COMMAND ----------
-
-import pytest
-import os
-
-test_dir = "/dbfs/tmp/pytest_framework/tests/"
-test_files = [
-    os.path.join(test_dir, "test_my_module.py"),
-    os.path.join(test_dir, "test_date.py")
-]
+test_files = node_ids_for("test_my_module.py", "test_date.py")
 
 # Run pytest and generate a JSON report
-pytest.main(["--json-report", "--json-report-file=/dbfs/tmp/pytest_results.json"] + test_files)
+run_pytest(["-n", "auto", "--dist=loadfile", "--json-report", "--json-report-file=/tmp/pytest_results.json"] + test_files)
+publish_report("/tmp/pytest_results.json")
 
 # COMMAND ----------
 
 # MAGIC %sh
-# MAGIC cat /dbfs/tmp/pytest_results.json
+# MAGIC cat /tmp/pytest_results.json
 
 # COMMAND ----------
 
@@ -122,17 +155,13 @@ test_add()
 # COMMAND ----------
 
 # MAGIC %%sh
-# MAGIC cp tests/test_phone_no_format.py /dbfs/tmp/pytest_framework/tests/
-
-# COMMAND ----------
-
-# MAGIC %%sh
-# MAGIC ls -lh /dbfs/tmp/pytest_framework/tests/
+# MAGIC ls -lh /tmp/pytest_framework/tests/
 
 # COMMAND ----------
 
 # MAGIC %sh
-# MAGIC pytest -v /dbfs/tmp/pytest_framework/tests/test_phone_no_format.py
+# MAGIC sh /tmp/sync_pytest_framework.sh
+# MAGIC pytest -v /tmp/pytest_framework/tests/test_phone_no_format.py
 
 # COMMAND ----------
 
@@ -142,48 +171,25 @@ test_add()
 
 # COMMAND ----------
 
-# MAGIC %pip install pytest
-
-# COMMAND ----------
-
-# MAGIC %%sh
-# MAGIC cp tests/test_data_validation.py /dbfs/tmp/pytest_framework/tests/
-
-# COMMAND ----------
-
 # MAGIC %sh
-# MAGIC pytest /dbfs/tmp/pytest_framework/tests/test_data_validation.py
-
-# COMMAND ----------
-
-# MAGIC %%sh
-# MAGIC cp tests/test_square_function_mark_parametrization.py /dbfs/tmp/pytest_framework/tests/
+# MAGIC sh /tmp/sync_pytest_framework.sh
+# MAGIC pytest /tmp/pytest_framework/tests/test_data_validation.py
 
 # COMMAND ----------
 
 # MAGIC %sh
-# MAGIC pytest /dbfs/tmp/pytest_framework/tests/test_square_function_mark_parametrization.py
-
-# COMMAND ----------
-
-# MAGIC %%sh
-# MAGIC cp src/data_validation_functions.py /dbfs/tmp/pytest_framework/src/
-# MAGIC cp tests/test_data_validation_functions.py /dbfs/tmp/pytest_framework/tests/
+# MAGIC sh /tmp/sync_pytest_framework.sh
+# MAGIC pytest /tmp/pytest_framework/tests/test_square_function_mark_parametrization.py
 
 # COMMAND ----------
 
 # Let's run it via python
 
-import pytest
-import os
-
-test_dir = "/dbfs/tmp/pytest_framework/tests/"
-test_files = [
-    os.path.join(test_dir, "test_data_validation_functions.py"),
-]
+test_files = node_ids_for("test_data_validation_functions.py")
 
 # Run pytest and generate a JSON report
-pytest.main(["--junitxml=/dbfs/tmp/pytest_results.xml"] + test_files)
+run_pytest(["-n", "auto", "--dist=loadfile", "--junitxml=/tmp/pytest_results.xml"] + test_files)
+publish_report("/tmp/pytest_results.xml")
 
 # COMMAND ----------
 
@@ -197,29 +203,21 @@ validate_email("@example.com")
 
 # Valid domains are com, org, net
 
+import re
+
+# One compiled pattern: a non-empty local part, a single @, and a com/org/net domain
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.(com|org|net)")
+
 def validate_email(email):
-    # email = "abc@example.com"
-    one_check = False # @ is proper or not
-    second_check = False # domain is proper or not
-    if len(email.split("@"))==2 and email.split("@")[0] and email.split("@")[1]:
-        one_check = True
-
-    if len(email.split("."))==2 and email.split(".")[0] and email.split(".")[1]:
-        domain = email.split(".")[1]
-        if domain in ["com", "org", "net"]:
-            second_check = True
-
-    if one_check and second_check:
-        return True
-    else:
-        return False
-    
+    return bool(EMAIL_PATTERN.fullmatch(email or ""))
+
 print(validate_email("@example.com"))
 print(validate_email("example.com"))
 print(validate_email("example"))
 print(validate_email("abc.example.com"))
 print(validate_email("abc@example.com")) # Valid
 print(validate_email("abc@example.in"))
+print(validate_email("abc@mail.example.com")) # Valid
 
 # COMMAND ----------
 
@@ -229,60 +227,39 @@ print(validate_email("abc@example.in"))
 
 # COMMAND ----------
 
-# MAGIC %%sh
-# MAGIC cp src/data_transformations.py /dbfs/tmp/pytest_framework/src/
-# MAGIC cp tests/test_data_transformations.py /dbfs/tmp/pytest_framework/tests/
-
-# COMMAND ----------
-
 # MAGIC %sh
-# MAGIC ls -lh /dbfs/tmp/pytest_framework/tests/
+# MAGIC ls -lh /tmp/pytest_framework/tests/
 
 # COMMAND ----------
 
 # MAGIC %sh
-# MAGIC pytest /dbfs/tmp/pytest_framework/tests/test_data_transformations.py
+# MAGIC sh /tmp/sync_pytest_framework.sh
+# MAGIC pytest /tmp/pytest_framework/tests/test_data_transformations.py
 
 # COMMAND ----------
 
 # Let's run it via python
 
-import pytest
-import os
-
-test_dir = "/dbfs/tmp/pytest_framework/tests/"
-test_files = [
-    os.path.join(test_dir, "test_data_transformations.py"),
-]
+test_files = node_ids_for("test_data_transformations.py")
 
 # Run pytest and generate a report
-pytest.main(["--junitxml=/dbfs/tmp/pytest_results.xml"] + test_files)
+run_pytest(["-n", "auto", "--dist=loadfile", "--junitxml=/tmp/pytest_results.xml"] + test_files)
+publish_report("/tmp/pytest_results.xml")
 
 # COMMAND ----------
 
 # MAGIC %sh
-# MAGIC cat /dbfs/tmp/pytest_results.xml
-
-# COMMAND ----------
-
-# MAGIC %%sh
-# MAGIC cp src/data_quality.py /dbfs/tmp/pytest_framework/src/
-# MAGIC cp tests/test_data_quality.py /dbfs/tmp/pytest_framework/tests/
+# MAGIC cat /tmp/pytest_results.xml
 
 # COMMAND ----------
 
 # Let's run it via python
 
-import pytest
-import os
-
-test_dir = "/dbfs/tmp/pytest_framework/tests/"
-test_files = [
-    os.path.join(test_dir, "test_data_quality.py"),
-]
+test_files = node_ids_for("test_data_quality.py")
 
 # Run pytest and generate a report
-pytest.main(["--junitxml=/dbfs/tmp/pytest_results.xml"] + test_files)
+run_pytest(["-n", "auto", "--dist=loadfile", "--junitxml=/tmp/pytest_results.xml"] + test_files)
+publish_report("/tmp/pytest_results.xml")
 
 # COMMAND ----------
 
@@ -307,7 +284,7 @@ pytest.main(["--junitxml=/dbfs/tmp/pytest_results.xml"] + test_files)
 # MAGIC
 # MAGIC Option 2: Force reload using `importlib`
 # MAGIC
-# MAGIC Option 3: Run pytest as a shell command (bypasses Python caching)
+# MAGIC Option 3: Run pytest as a shell command (bypasses Python caching) - the `run_pytest` helper above does this with `subprocess` after refreshing `/tmp/pytest_framework` from the workspace, so each run imports the code as it is saved now
 
 # COMMAND ----------
 
@@ -317,24 +294,20 @@ pytest.main(["--junitxml=/dbfs/tmp/pytest_results.xml"] + test_files)
 # COMMAND ----------
 
 # MAGIC %sh
-# MAGIC pytest /dbfs/tmp/pytest_framework/tests/test_data_quality.py
+# MAGIC sh /tmp/sync_pytest_framework.sh
+# MAGIC pytest /tmp/pytest_framework/tests/test_data_quality.py
 
 # COMMAND ----------
 
 # MAGIC %%sh
-# MAGIC pytest /dbfs/tmp/pytest_framework/tests/test_data_quality.py::test_check_data_completeness
-
-# COMMAND ----------
-
-# MAGIC %%sh
-# MAGIC
-# MAGIC cp src/elt_functions.py /dbfs/tmp/pytest_framework/src/
-# MAGIC cp tests/test_elt_functions.py /dbfs/tmp/pytest_framework/tests/
+# MAGIC sh /tmp/sync_pytest_framework.sh
+# MAGIC pytest /tmp/pytest_framework/tests/test_data_quality.py::test_check_data_completeness
 
 # COMMAND ----------
 
 # MAGIC %sh
-# MAGIC pytest /dbfs/tmp/pytest_framework/tests/test_elt_functions.py
+# MAGIC sh /tmp/sync_pytest_framework.sh
+# MAGIC pytest /tmp/pytest_framework/tests/test_elt_functions.py
 
 # COMMAND ----------
 
@@ -11,8 +11,12 @@ def calculate_total_sales(sales_list):
         return 0
     return sum(sales_list)
 
-def convert_currency(amount, rate):
-    """Convert currency with exchange rate"""
+def convert_currency_raw(amount, rate):
+    """Convert currency with exchange rate without rounding"""
     if rate <= 0:
         raise ValueError("Exchange rate must be positive")
-    return round(amount * rate, 2)
\ No newline at end of file
+    return amount * rate
+
+def convert_currency(amount, rate):
+    """Convert currency with exchange rate"""
+    return round(convert_currency_raw(amount, rate), 2)
\ No newline at end of file
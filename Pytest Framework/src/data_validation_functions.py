@@ -3,8 +3,13 @@ def validate_email(email):
     """Validate email format"""
     return "@" in email and "." in email
 
+# Translation table that deletes every non-digit ASCII character
+ASCII_NON_DIGITS = str.maketrans('', '', ''.join(chr(c) for c in range(128) if not chr(c).isdigit()))
+
 def clean_phone_number(phone):
     """Clean phone number by removing non-digits"""
+    if phone.isascii():
+        return phone.translate(ASCII_NON_DIGITS)
     return ''.join(filter(str.isdigit, phone))
 
 def validate_age(age):
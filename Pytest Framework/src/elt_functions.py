@@ -1,3 +1,44 @@
+import bisect
+import re
+
+# Public names for `from elt_functions import *`, so the modules imported above stay out
+__all__ = [
+    "ORDER_CATEGORY_THRESHOLDS",
+    "ORDER_CATEGORY_LABELS",
+    "EMAIL_CHECK_PATTERN",
+    "check_order_id",
+    "check_email",
+    "check_quantity",
+    "check_price",
+    "check_age",
+    "clean_text",
+    "clean_name",
+    "clean_email",
+    "clean_product_name",
+    "calculate_total_raw",
+    "calculate_total",
+    "calculate_tax_raw",
+    "calculate_tax",
+    "get_order_category",
+    "check_order_id_series",
+    "check_email_series",
+    "check_quantity_series",
+    "check_price_series",
+    "check_age_series",
+    "calculate_total_series",
+    "calculate_tax_series",
+    "get_order_category_series",
+    "clean_name_series",
+    "clean_email_series"
+]
+
+# Lower bounds of the LOW / MEDIUM / HIGH order categories
+ORDER_CATEGORY_THRESHOLDS = (0, 500, 1000)
+ORDER_CATEGORY_LABELS = ("INVALID", "LOW", "MEDIUM", "HIGH")
+
+# An @ followed somewhere later by a dot, found in one scan
+EMAIL_CHECK_PATTERN = re.compile(r"@.*\.")
+
 def check_order_id(order_id):
     """Check if order ID is valid format: ORD-YYYY-NNN"""
     if not order_id:
@@ -13,7 +54,7 @@ def check_email(email):
     if not email:
         return False, "Email is empty"
         
-    if "@" not in email or "." not in email:
+    if not EMAIL_CHECK_PATTERN.search(email):
         return False, "Email must have @ and ."
         
     return True, "Valid"
@@ -57,41 +98,94 @@ def check_age(age, min_age, max_age):
         
     return True, "Valid"
 
+def clean_text(text, normalize):
+    """Strip surrounding spaces and apply a case normalization (e.g. str.title)"""
+    if not text:
+        return ""
+    return normalize(text.strip())
+
 def clean_name(name):
     """Clean customer name - remove extra spaces and capitalize properly"""
-    if not name:
-        return ""
-    return name.strip().title()
+    return clean_text(name, str.title)
 
 def clean_email(email):
     """Clean email - remove spaces and convert to lowercase"""
-    if not email:
-        return ""
-    return email.strip().lower()
+    return clean_text(email, str.lower)
 
 def clean_product_name(product_name):
     """Clean product name - remove extra spaces and capitalize"""
-    if not product_name:
-        return ""
-    return product_name.strip().title()
+    return clean_text(product_name, str.title)
 
-def calculate_total(quantity, price):
-    """Calculate total amount for the order"""
+def calculate_total_raw(quantity, price):
+    """Calculate total amount for the order without rounding"""
     if quantity is None or price is None:
         return 0.0
-    return round(quantity * price, 2)
+    return quantity * price
+
+def calculate_total(quantity, price):
+    """Calculate total amount for the order"""
+    return round(calculate_total_raw(quantity, price), 2)
+
+def calculate_tax_raw(total_amount):
+    """Calculate tax (10% of total) without rounding"""
+    return total_amount * 0.10
 
 def calculate_tax(total_amount):
     """Calculate tax (10% of total)"""
-    return round(total_amount * 0.10, 2)
+    return round(calculate_tax_raw(total_amount), 2)
 
 def get_order_category(total_amount):
     """Categorize order by total value"""
-    if total_amount >= 1000:
-        return "HIGH"
-    elif total_amount >= 500:
-        return "MEDIUM" 
-    elif total_amount > 0:
-        return "LOW"
-    else:
-        return "INVALID"
\ No newline at end of file
+    if not total_amount > 0:
+        return "INVALID"
+    return ORDER_CATEGORY_LABELS[bisect.bisect_right(ORDER_CATEGORY_THRESHOLDS, total_amount)]
+
+# Vectorized versions of the checks above for validating a whole DataFrame column at once.
+# They return a boolean Series (True = valid) instead of (is_valid, message) per row.
+
+def check_order_id_series(order_ids):
+    """Vectorized check_order_id"""
+    return order_ids.fillna("").str.startswith("ORD-")
+
+def check_email_series(emails):
+    """Vectorized check_email"""
+    return emails.fillna("").str.contains(EMAIL_CHECK_PATTERN)
+
+def check_quantity_series(quantities, max_allowed):
+    """Vectorized check_quantity"""
+    return (quantities > 0) & (quantities <= max_allowed)
+
+def check_price_series(prices, min_price, max_price):
+    """Vectorized check_price"""
+    return prices.between(min_price, max_price)
+
+def check_age_series(ages, min_age, max_age):
+    """Vectorized check_age"""
+    return ages.between(min_age, max_age)
+
+def calculate_total_series(quantities, prices):
+    """Vectorized calculate_total"""
+    return (quantities * prices).fillna(0.0).round(2)
+
+def calculate_tax_series(total_amounts):
+    """Vectorized calculate_tax"""
+    return (total_amounts * 0.10).round(2)
+
+def get_order_category_series(total_amounts):
+    """Vectorized get_order_category"""
+    # Imported here so the scalar checks don't pay for loading numpy/pandas
+    import numpy as np
+    import pandas as pd
+    
+    positions = np.searchsorted(ORDER_CATEGORY_THRESHOLDS, total_amounts, side="right")
+    categories = np.take(ORDER_CATEGORY_LABELS, positions)
+    categories[~(total_amounts > 0)] = "INVALID"
+    return pd.Series(categories, index=total_amounts.index)
+
+def clean_name_series(names):
+    """Vectorized clean_name / clean_product_name"""
+    return names.fillna("").str.strip().str.title()
+
+def clean_email_series(emails):
+    """Vectorized clean_email"""
+    return emails.fillna("").str.strip().str.lower()
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Put src/ on the Python path once for every test file
+SRC_DIR = str(Path(__file__).resolve().parent.parent / "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+DATE_COLUMNS = ["OrderDate", "ShippingDate", "ExpectedDeliveryDate", "ActualDeliveryDate"]
+
+
+# Shared by test_date.py and test_multiple_date_cases.py.
+# Parsed once per session; tests only read the datetime columns
+@pytest.fixture(scope="session")
+def sample_orders_data():
+    # pandas is imported here, not at module level, so collecting this file stays cheap
+    import pandas as pd
+
+    df = pd.DataFrame(
+        {
+            "OrderDate": [
+                "2024-06-15 18:30:00+00:00",
+                "1993-07-21 01:09:00+00:00",
+                None,
+            ],
+            "ShippingDate": [
+                "2024-06-26 14:05:00+00:00",
+                "1993-07-29 07:06:00+00:00",
+                "2024-06-27 08:00:00+00:00",
+            ],
+            "ExpectedDeliveryDate": [
+                "2024-07-15 19:48:00+00:00",
+                "1993-08-06 22:24:00+00:00",
+                "2024-07-05 12:00:00+00:00",
+            ],
+            "ActualDeliveryDate": [
+                "2024-08-10 11:00:00+00:00",
+                "1993-08-27 12:01:00+00:00",
+                None,
+            ],
+        }
+    )
+    df[DATE_COLUMNS] = df[DATE_COLUMNS].apply(
+        pd.to_datetime, format="%Y-%m-%d %H:%M:%S%z", errors="coerce", utc=True
+    )
+    return df
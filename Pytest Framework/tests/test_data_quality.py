@@ -1,9 +1,3 @@
-import sys
-import os
-
-# Add the src/ directory to the Python path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-
 from data_quality import check_data_completeness, validate_data_types
 
 # In Databricks cell 6: Data Quality Tests
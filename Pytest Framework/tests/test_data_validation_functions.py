@@ -1,9 +1,3 @@
-import sys
-import os
-
-# Add the src/ directory to the Python path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-
 from data_validation_functions import validate_email, clean_phone_number, validate_age
 
 # In Databricks cell 2: Write tests
@@ -1,13 +1,7 @@
-import sys
-import os
-
 import pytest
 from datetime import datetime, timedelta
 import re
 
-# Add the src/ directory to the Python path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-
 from elt_functions import *
 
 # In Databricks Cell 2: Define pytest Fixtures
@@ -213,6 +207,10 @@ def test_total_calculation(sample_orders):
     total_missing = calculate_total(None, 100.0)
     assert total_missing == 0.0
 
+    # Raw total keeps full precision; the rounded one is for display
+    assert calculate_total_raw(3, 0.1) == 3 * 0.1
+    assert calculate_total(3, 0.1) == 0.3
+
 def test_tax_calculation(sample_orders):
     """Test tax calculation"""
     orders = sample_orders
@@ -243,4 +241,41 @@ def test_order_categorization(sample_orders):
     
     # Let's test with a known invalid case
     invalid_category = get_order_category(0)
-    assert invalid_category == "INVALID"
\ No newline at end of file
+    assert invalid_category == "INVALID"
+
+# Vectorized checks should agree with the scalar checks row by row
+
+def test_vectorized_checks_match_scalar(sample_orders, business_rules):
+    """Test the *_series functions against the scalar functions on fixture data"""
+    import pandas as pd
+
+    orders = pd.DataFrame(sample_orders)
+    rules = business_rules
+
+    assert check_order_id_series(orders["order_id"]).tolist() == [
+        check_order_id(order_id)[0] for order_id in orders["order_id"]
+    ]
+    assert check_email_series(orders["customer_email"]).tolist() == [
+        check_email(email)[0] for email in orders["customer_email"]
+    ]
+    assert check_quantity_series(orders["quantity"], rules["max_quantity"]).tolist() == [
+        check_quantity(quantity, rules["max_quantity"])[0] for quantity in orders["quantity"]
+    ]
+    assert check_price_series(orders["price"], rules["min_price"], rules["max_price"]).tolist() == [
+        check_price(price, rules["min_price"], rules["max_price"])[0] for price in orders["price"]
+    ]
+    assert check_age_series(orders["customer_age"], rules["min_age"], rules["max_age"]).tolist() == [
+        check_age(order["customer_age"], rules["min_age"], rules["max_age"])[0] for order in sample_orders
+    ]
+
+    assert clean_name_series(orders["product_name"]).tolist() == [
+        clean_product_name(name) for name in orders["product_name"]
+    ]
+    assert clean_email_series(orders["customer_email"].str.upper()).tolist() == [
+        clean_email(email.upper()) for email in orders["customer_email"]
+    ]
+
+    totals = calculate_total_series(orders["quantity"], orders["price"])
+    assert totals.tolist() == [calculate_total(o["quantity"], o["price"]) for o in sample_orders]
+    assert calculate_tax_series(totals).tolist() == [calculate_tax(total) for total in totals]
+    assert get_order_category_series(totals).tolist() == [get_order_category(total) for total in totals]
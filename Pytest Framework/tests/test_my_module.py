@@ -1,9 +1,3 @@
-import sys
-import os
-
-# Add the src/ directory to the Python path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-
 from my_module import add
 
 
@@ -1,10 +1,15 @@
-import pandas as pd
 import pytest
 import re
 
+# Expected pattern: +91 -XXXXXXXXXX, compiled once for every test run
+PHONE_PATTERN = re.compile(r"^\+91\s-\d{10}$")
+
 # Define a pytest fixture to create sample data
 @pytest.fixture
 def sample_phone_data():
+    # pandas is imported here, not at module level, so collecting this file stays cheap
+    import pandas as pd
+
     return pd.DataFrame(
         {
             "phone_number": [
@@ -24,10 +29,8 @@ def test_phone_number_format(sample_phone_data):
     This test ensures that phone numbers follow the correct format:
     '+91 -XXXXXXXXXX' where X is a digit.
     """
-    pattern = r"^\+91\s-\d{10}$"  # Expected pattern: +91 -XXXXXXXXXX
-
-    # Apply regex check for each phone number
-    sample_phone_data["valid_format"] = sample_phone_data["phone_number"].apply(lambda x: bool(re.match(pattern, x)))
+    # Apply regex check to the whole column at once
+    sample_phone_data["valid_format"] = sample_phone_data["phone_number"].str.match(PHONE_PATTERN)
 
     # Assert that all phone numbers match the expected pattern
     assert sample_phone_data["valid_format"].all(), "❌ Some phone numbers do not match the expected format!"
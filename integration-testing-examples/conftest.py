@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    """Spread the test classes across CPU cores when pytest-xdist is installed"""
+    # -n on the command line (including -n 0) wins; without xdist the suite runs serially
+    if config.pluginmanager.hasplugin("xdist") and config.option.numprocesses is None:
+        config.option.numprocesses = "auto"
+        config.option.dist = "loadscope"
@@ -1,64 +1,136 @@
 # Retail ETL Example: Product Inventory Update
 # Scenario: ETL process updates product inventory from multiple supplier feeds
 
+import csv
+import io
 import json
 import logging
-from typing import List, Dict, Any
+from itertools import chain, islice
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Dict, Any
 from unittest.mock import Mock, patch, MagicMock
 import unittest
 import pytest
+import time
 from datetime import datetime
 
+try:
+    import ijson
+except ImportError:  # fall back to loading the whole feed at once
+    ijson = None
+
+try:
+    from orjson import loads as load_json
+except ImportError:  # stdlib parser when orjson is not installed
+    from json import loads as load_json
+
+try:
+    from pymysql.err import OperationalError
+except ImportError:  # driver not installed; same (errno, message) args shape
+    class OperationalError(Exception):
+        """Stand-in for the MySQL driver's OperationalError"""
+
+try:
+    from psycopg2.errors import DeadlockDetected
+except ImportError:  # PostgreSQL driver not installed
+    class DeadlockDetected(Exception):
+        """Stand-in for psycopg2's DeadlockDetected (SQLSTATE 40P01)"""
+
+# MySQL error code for "Deadlock found when trying to get lock"
+ER_LOCK_DEADLOCK = 1213
+
+# Rows sent to the database per executemany call
+LOAD_BATCH_SIZE = 1000
+
+# Deadlocked load transactions are replayed up to this many times in total,
+# sleeping DEADLOCK_BACKOFF_SECONDS * 2**attempt between attempts
+MAX_DEADLOCK_RETRIES = 3
+DEADLOCK_BACKOFF_SECONDS = 0.05
+
+# Supplier feed fields read by transform_product_data, pulled out of a product as one tuple
+_GET_SUPPLIER_FIELDS = itemgetter('sku', 'stock_level', 'unit_price', 'supplier_code')
+
+
+def batched(rows: Iterable[Dict], batch_size: int = LOAD_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """Yield successive lists of up to batch_size rows"""
+    iterator = iter(rows)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
 # ETL Class that processes product inventory updates
 class ProductInventoryETL:
+    # Built once so every batch sends the identical statement; drivers that cache
+    # prepared statements by SQL text (and MySQL drivers that rewrite executemany
+    # into one multi-row INSERT) can reuse it
+    _INSERT_SQL = """
+        INSERT INTO product_inventory 
+        (product_id, quantity, price, supplier_id, last_updated)
+        VALUES (%(product_id)s, %(quantity)s, %(price)s, %(supplier_id)s, %(last_updated)s)
+        ON DUPLICATE KEY UPDATE 
+        quantity = VALUES(quantity),
+        price = VALUES(price),
+        last_updated = VALUES(last_updated)
+    """
+    
     def __init__(self, db_connection):
         self.db_connection = db_connection
         self.logger = logging.getLogger(__name__)
     
-    def extract_supplier_data(self, supplier_file: str) -> List[Dict]:
-        """Extract product data from supplier feed"""
-        with open(supplier_file, 'r') as f:
-            data = json.load(f)
-        return data.get('products', [])
+    def extract_supplier_data(self, supplier_file: str) -> Iterator[Dict]:
+        """Extract product data from supplier feed, one product at a time"""
+        # Open and start parsing here rather than on first iteration, so a missing or
+        # malformed feed fails as an extraction error instead of inside the load
+        f = open(supplier_file, 'rb')
+        if ijson is None:
+            with f:
+                return iter(load_json(f.read()).get('products', []))
+        
+        try:
+            # Stream the products array instead of loading the whole feed into memory
+            products = ijson.items(f, 'products.item', use_float=True)
+            head = list(islice(products, 1))
+        except Exception:
+            f.close()
+            raise
+        return self._stream_products(f, chain(head, products))
+    
+    @staticmethod
+    def _stream_products(f, products: Iterator[Dict]) -> Iterator[Dict]:
+        """Yield the remaining products, closing the feed once they are consumed"""
+        with f:
+            yield from products
     
-    def transform_product_data(self, raw_products: List[Dict]) -> List[Dict]:
+    def transform_product_data(self, raw_products: Iterable[Dict]) -> Iterator[Dict]:
         """Transform supplier data to internal format"""
-        transformed = []
+        # One timestamp for the whole run rather than a clock read per product
+        last_updated = datetime.now().isoformat()
         for product in raw_products:
             # Transform supplier format to internal format
-            transformed_product = {
-                'product_id': product['sku'],
-                'quantity': int(product['stock_level']),
-                'price': float(product['unit_price']),
-                'supplier_id': product['supplier_code'],
-                'last_updated': datetime.now().isoformat()
+            sku, stock_level, unit_price, supplier_code = _GET_SUPPLIER_FIELDS(product)
+            yield {
+                'product_id': sku,
+                'quantity': int(stock_level),
+                'price': float(unit_price),
+                'supplier_id': supplier_code,
+                'last_updated': last_updated
             }
-            transformed.append(transformed_product)
-        return transformed
     
-    def load_to_database(self, products: List[Dict]) -> bool:
+    def load_to_database(self, products: Iterable[Dict]) -> bool:
         """Load transformed data to database"""
         try:
             cursor = self.db_connection.cursor()
             
             # This is where the issue occurs in integration tests
-            for product in products:
+            for batch in batched(products):
                 # Unit tests don't catch the constraint violation
-                cursor.execute("""
-                    INSERT INTO product_inventory 
-                    (product_id, quantity, price, supplier_id, last_updated)
-                    VALUES (%(product_id)s, %(quantity)s, %(price)s, %(supplier_id)s, %(last_updated)s)
-                    ON DUPLICATE KEY UPDATE 
-                    quantity = VALUES(quantity),
-                    price = VALUES(price),
-                    last_updated = VALUES(last_updated)
-                """, product)
+                cursor.executemany(self._INSERT_SQL, batch)
             
             self.db_connection.commit()
             return True
             
         except Exception as e:
-            self.logger.error(f"Database operation failed: {e}")
+            self.logger.error("Database operation failed: %s", e)
             self.db_connection.rollback()
             return False
     
@@ -75,7 +147,7 @@ class ProductInventoryETL:
             return self.load_to_database(transformed_data)
             
         except Exception as e:
-            self.logger.error(f"ETL process failed: {e}")
+            self.logger.error("ETL process failed: %s", e)
             return False
 
 
@@ -83,35 +155,98 @@ class ProductInventoryETL:
 # UNIT TESTS (THESE PASS) - Mocked Database
 # =====================================================
 
+# Supplier feed served by the extract tests, serialized once for the whole module
+_SUPPLIER_FEED_JSON = json.dumps({
+    "products": [
+        {"sku": "PROD001", "stock_level": "100", "unit_price": "29.99", "supplier_code": "SUP001"},
+        {"sku": "PROD002", "stock_level": "50", "unit_price": "19.99", "supplier_code": "SUP001"}
+    ]
+}).encode()
+
+
+class _FakeCursor:
+    """Lightweight DB-API cursor stub that records calls instead of building Mocks"""
+    def __init__(self):
+        self.calls = []
+        self.rows = []
+        # Optional callable(sql, rows) that raises to simulate the database rejecting a batch
+        self.executemany_hook = None
+    
+    def execute(self, sql, params=None):
+        self.calls.append(('execute', sql, params))
+    
+    def executemany(self, sql, rows):
+        self.calls.append(('executemany', sql, rows))
+        if self.executemany_hook is not None:
+            self.executemany_hook(sql, rows)
+    
+    def copy_expert(self, sql, file):
+        self.calls.append(('copy_expert', sql, file.read()))
+    
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+    
+    def fetchall(self):
+        return list(self.rows)
+    
+    def count(self, method: str) -> int:
+        return sum(1 for call in self.calls if call[0] == method)
+
+
+class _FakeDB:
+    """Lightweight DB connection stub that hands out one cursor and records commits/rollbacks"""
+    def __init__(self):
+        self._cursor = _FakeCursor()
+        self.calls = []
+    
+    def cursor(self):
+        return self._cursor
+    
+    def commit(self):
+        self.calls.append('commit')
+    
+    def rollback(self):
+        self.calls.append('rollback')
+
+
 class TestProductInventoryETLUnit(unittest.TestCase):
     def setUp(self):
-        self.mock_db = MagicMock()
-        self.mock_cursor = MagicMock()
-        self.mock_db.cursor.return_value = self.mock_cursor
-        self.etl = ProductInventoryETL(self.mock_db)
+        self.fake_db = _FakeDB()
+        self.fake_cursor = self.fake_db.cursor()
+        self.etl = ProductInventoryETL(self.fake_db)
     
-    @patch('builtins.open')
-    def test_extract_supplier_data_success(self, mock_open):
+    def test_extract_supplier_data_success(self):
         # Mock file content
-        mock_file_content = json.dumps({
-            "products": [
-                {"sku": "PROD001", "stock_level": "100", "unit_price": "29.99", "supplier_code": "SUP001"},
-                {"sku": "PROD002", "stock_level": "50", "unit_price": "19.99", "supplier_code": "SUP001"}
-            ]
-        })
-        mock_open.return_value.__enter__.return_value.read.return_value = mock_file_content
-        
-        result = self.etl.extract_supplier_data("test_file.json")
+        with patch('builtins.open', return_value=io.BytesIO(_SUPPLIER_FEED_JSON)):
+            result = list(self.etl.extract_supplier_data("test_file.json"))
         
         self.assertEqual(len(result), 2)
         self.assertEqual(result[0]['sku'], 'PROD001')
     
+    def test_extract_supplier_data_without_ijson(self):
+        # Whole-document parse path used when ijson is not installed
+        with patch(f'{__name__}.ijson', None), \
+                patch('builtins.open', return_value=io.BytesIO(_SUPPLIER_FEED_JSON)):
+            result = list(self.etl.extract_supplier_data("test_file.json"))
+        
+        self.assertEqual([product['sku'] for product in result], ['PROD001', 'PROD002'])
+    
+    def test_process_inventory_update_fails_in_extract_for_missing_feed(self):
+        with patch('builtins.open', side_effect=FileNotFoundError("missing.json")), \
+                self.assertLogs(level='ERROR') as logs:
+            result = self.etl.process_inventory_update("missing.json")
+        
+        # Reported as an ETL failure before the load starts, not as a database rollback
+        self.assertFalse(result)
+        self.assertIn("ETL process failed", logs.output[0])
+        self.assertEqual(self.fake_db.calls, [])
+    
     def test_transform_product_data_success(self):
         raw_data = [
             {"sku": "PROD001", "stock_level": "100", "unit_price": "29.99", "supplier_code": "SUP001"}
         ]
         
-        result = self.etl.transform_product_data(raw_data)
+        result = list(self.etl.transform_product_data(raw_data))
         
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0]['product_id'], 'PROD001')
@@ -120,19 +255,37 @@ class TestProductInventoryETLUnit(unittest.TestCase):
     
     def test_load_to_database_success(self):
         # Mock successful database operations
-        self.mock_cursor.execute.return_value = None
-        self.mock_db.commit.return_value = None
+        mock_db = MagicMock()
+        mock_cursor = MagicMock()
+        mock_db.cursor.return_value = mock_cursor
+        mock_cursor.executemany.return_value = None
+        mock_db.commit.return_value = None
+        etl = ProductInventoryETL(mock_db)
         
         test_products = [
             {'product_id': 'PROD001', 'quantity': 100, 'price': 29.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'}
         ]
         
-        result = self.etl.load_to_database(test_products)
+        result = etl.load_to_database(test_products)
         
         # Unit test passes because database is mocked
         self.assertTrue(result)
-        self.mock_cursor.execute.assert_called()
-        self.mock_db.commit.assert_called()
+        mock_cursor.executemany.assert_called()
+        mock_db.commit.assert_called()
+    
+    def test_load_to_database_batches_inserts(self):
+        test_products = [
+            {'product_id': f'PROD{i:03d}', 'quantity': 1, 'price': 9.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'}
+            for i in range(LOAD_BATCH_SIZE + 1)
+        ]
+        
+        result = self.etl.load_to_database(test_products)
+        
+        # One executemany per batch and a single commit, not one call per row
+        self.assertTrue(result)
+        self.assertEqual(self.fake_cursor.count('executemany'), 2)
+        self.assertEqual(self.fake_cursor.count('execute'), 0)
+        self.assertEqual(self.fake_db.calls, ['commit'])
 
 
 # =====================================================
@@ -141,11 +294,10 @@ class TestProductInventoryETLUnit(unittest.TestCase):
 
 class TestProductInventoryETLIntegration(unittest.TestCase):
     def setUp(self):
-        # Mock database that simulates real database behavior
-        self.mock_db = MagicMock()
-        self.mock_cursor = MagicMock()
-        self.mock_db.cursor.return_value = self.mock_cursor
-        self.etl = ProductInventoryETL(self.mock_db)
+        # Fake database that simulates real database behavior
+        self.fake_db = _FakeDB()
+        self.fake_cursor = self.fake_db.cursor()
+        self.etl = ProductInventoryETL(self.fake_db)
     
     def test_load_to_database_foreign_key_constraint_failure(self):
         """Integration test reveals foreign key constraint issues"""
@@ -157,7 +309,7 @@ class TestProductInventoryETLIntegration(unittest.TestCase):
             if 'supplier_id' in str(args):
                 raise Exception("Foreign key constraint fails: supplier_id 'SUP999' doesn't exist in suppliers table")
         
-        self.mock_cursor.execute.side_effect = mock_execute_with_constraint_error
+        self.fake_cursor.executemany_hook = mock_execute_with_constraint_error
         
         test_products = [
             {
@@ -173,7 +325,7 @@ class TestProductInventoryETLIntegration(unittest.TestCase):
         
         # Integration test FAILS - reveals the real constraint issue
         self.assertFalse(result)
-        self.mock_db.rollback.assert_called()
+        self.assertIn('rollback', self.fake_db.calls)
     
     def test_load_to_database_concurrent_update_conflict(self):
         """Integration test reveals concurrency issues"""
@@ -181,7 +333,7 @@ class TestProductInventoryETLIntegration(unittest.TestCase):
         def mock_execute_with_deadlock(*args, **kwargs):
             raise Exception("Deadlock found when trying to get lock; try restarting transaction")
         
-        self.mock_cursor.execute.side_effect = mock_execute_with_deadlock
+        self.fake_cursor.executemany_hook = mock_execute_with_deadlock
         
         test_products = [
             {'product_id': 'PROD001', 'quantity': 100, 'price': 29.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'}
@@ -198,11 +350,11 @@ class TestProductInventoryETLIntegration(unittest.TestCase):
         def mock_execute_with_type_error(*args, **kwargs):
             if any('quantity' in str(arg) for arg in args):
                 # Real database would validate that quantity must be non-negative
-                product_data = args[1] if len(args) > 1 else {}
-                if isinstance(product_data, dict) and product_data.get('quantity', 0) < 0:
+                batch = args[1] if len(args) > 1 else []
+                if any(product.get('quantity', 0) < 0 for product in batch):
                     raise Exception("Check constraint violation: quantity must be >= 0")
         
-        self.mock_cursor.execute.side_effect = mock_execute_with_type_error
+        self.fake_cursor.executemany_hook = mock_execute_with_type_error
         
         test_products = [
             {
@@ -266,61 +418,283 @@ def demonstrate_unit_vs_integration_testing():
 # =====================================================
 
 class ImprovedProductInventoryETL:
-    def __init__(self, db_connection):
+    # Rows are staged in a temporary table first so the database itself filters out
+    # unknown suppliers and negative quantities while merging into product_inventory
+    _STAGING_DDL = (
+        "DROP TEMPORARY TABLE IF EXISTS stg_inventory",
+        """
+        CREATE TEMPORARY TABLE stg_inventory AS
+        SELECT product_id, quantity, price, supplier_id, last_updated
+        FROM product_inventory WHERE 1 = 0
+        """
+    )
+    _STAGE_SQL = """
+        INSERT INTO stg_inventory 
+        (product_id, quantity, price, supplier_id, last_updated)
+        VALUES (%(product_id)s, %(quantity)s, %(price)s, %(supplier_id)s, %(last_updated)s)
+    """
+    _REJECTED_SQL = """
+        SELECT s.product_id, s.supplier_id, s.quantity
+        FROM stg_inventory s
+        LEFT JOIN suppliers sup ON sup.supplier_id = s.supplier_id
+        WHERE sup.supplier_id IS NULL OR s.quantity < 0
+    """
+    _MERGE_SQL = """
+        INSERT INTO product_inventory 
+        (product_id, quantity, price, supplier_id, last_updated)
+        SELECT s.product_id, s.quantity, s.price, s.supplier_id, s.last_updated
+        FROM stg_inventory s
+        JOIN suppliers sup ON sup.supplier_id = s.supplier_id
+        WHERE s.quantity >= 0
+        ON DUPLICATE KEY UPDATE 
+        quantity = VALUES(quantity),
+        price = VALUES(price),
+        last_updated = VALUES(last_updated)
+    """
+    
+    # PostgreSQL equivalents: COPY the rows into the staging table and merge with ON CONFLICT.
+    # The temporary table is dropped on commit and, being transactional, on rollback too
+    _PG_STAGING_DDL = (
+        "CREATE TEMPORARY TABLE stg_inventory (LIKE product_inventory INCLUDING DEFAULTS) ON COMMIT DROP",
+        # COPY fills stg_seq in file order, so the merge can keep the last row per product
+        "ALTER TABLE stg_inventory ADD COLUMN stg_seq BIGSERIAL",
+    )
+    _PG_COPY_SQL = """
+        COPY stg_inventory (product_id, quantity, price, supplier_id, last_updated)
+        FROM STDIN WITH (FORMAT csv)
+    """
+    _PG_MERGE_SQL = """
+        INSERT INTO product_inventory 
+        (product_id, quantity, price, supplier_id, last_updated)
+        SELECT DISTINCT ON (s.product_id)
+        s.product_id, s.quantity, s.price, s.supplier_id, s.last_updated
+        FROM stg_inventory s
+        JOIN suppliers sup ON sup.supplier_id = s.supplier_id
+        WHERE s.quantity >= 0
+        ORDER BY s.product_id, s.stg_seq DESC
+        ON CONFLICT (product_id) DO UPDATE SET 
+        quantity = EXCLUDED.quantity,
+        price = EXCLUDED.price,
+        last_updated = EXCLUDED.last_updated
+    """
+    _GET_INVENTORY_ROW = itemgetter('product_id', 'quantity', 'price', 'supplier_id', 'last_updated')
+    
+    def __init__(self, db_connection, dialect: str = None):
         self.db_connection = db_connection
         self.logger = logging.getLogger(__name__)
+        # psycopg2 connections load through copy_expert; anything else gets the MySQL
+        # statements. psycopg 3 (module 'psycopg') has neither copy_expert nor
+        # psycopg2's DeadlockDetected, so it is deliberately not matched here
+        if dialect is None:
+            dialect = 'postgresql' if type(db_connection).__module__.split('.')[0] == 'psycopg2' else 'mysql'
+        self.dialect = dialect
     
-    def validate_supplier_exists(self, supplier_id: str) -> bool:
-        """Validate supplier exists before inserting products"""
-        cursor = self.db_connection.cursor()
-        cursor.execute("SELECT COUNT(*) FROM suppliers WHERE supplier_id = %s", (supplier_id,))
-        return cursor.fetchone()[0] > 0
+    def _stage_products(self, cursor, products: List[Dict]) -> None:
+        """Load all rows as-is into a fresh stg_inventory temporary table"""
+        if self.dialect == 'postgresql':
+            for statement in self._PG_STAGING_DDL:
+                cursor.execute(statement)
+            # One COPY per batch keeps the in-memory CSV buffer bounded
+            for batch in batched(products):
+                csv_io = io.StringIO()
+                csv.writer(csv_io).writerows(map(self._GET_INVENTORY_ROW, batch))
+                csv_io.seek(0)
+                cursor.copy_expert(self._PG_COPY_SQL, csv_io)
+        else:
+            for statement in self._STAGING_DDL:
+                cursor.execute(statement)
+            for batch in batched(products):
+                cursor.executemany(self._STAGE_SQL, batch)
     
-    def load_to_database_improved(self, products: List[Dict]) -> bool:
+    def load_to_database_improved(self, products: Iterable[Dict]) -> bool:
         """Improved load method that handles real database constraints"""
         try:
             cursor = self.db_connection.cursor()
             
-            for product in products:
-                # Validate data before insert
-                if product['quantity'] < 0:
-                    self.logger.warning(f"Skipping product {product['product_id']}: negative quantity")
-                    continue
-                
-                # Check if supplier exists
-                if not self.validate_supplier_exists(product['supplier_id']):
-                    self.logger.warning(f"Skipping product {product['product_id']}: supplier {product['supplier_id']} doesn't exist")
-                    continue
-                
-                # Retry logic for deadlocks
-                max_retries = 3
-                for attempt in range(max_retries):
-                    try:
-                        cursor.execute("""
-                            INSERT INTO product_inventory 
-                            (product_id, quantity, price, supplier_id, last_updated)
-                            VALUES (%(product_id)s, %(quantity)s, %(price)s, %(supplier_id)s, %(last_updated)s)
-                            ON DUPLICATE KEY UPDATE 
-                            quantity = VALUES(quantity),
-                            price = VALUES(price),
-                            last_updated = VALUES(last_updated)
-                        """, product)
-                        break
-                    except Exception as e:
-                        if "Deadlock" in str(e) and attempt < max_retries - 1:
-                            self.logger.warning(f"Deadlock detected, retrying... (attempt {attempt + 1})")
-                            continue
-                        else:
-                            raise
+            # Materialize once: a deadlock retry must replay the same rows, and a
+            # generator (e.g. from transform_product_data) would be empty the second time
+            products = list(products)
             
-            self.db_connection.commit()
-            return True
+            # Retry logic for deadlocks: a deadlock aborts the whole transaction,
+            # so roll back and replay every batch rather than the failed statement
+            for attempt in range(MAX_DEADLOCK_RETRIES):
+                try:
+                    # Stage all rows as-is
+                    self._stage_products(cursor, products)
+                    
+                    # Report the rows the merge will leave out
+                    cursor.execute(self._REJECTED_SQL)
+                    for product_id, supplier_id, quantity in cursor.fetchall():
+                        if quantity < 0:
+                            self.logger.warning("Skipping product %s: negative quantity", product_id)
+                        else:
+                            self.logger.warning("Skipping product %s: supplier %s doesn't exist", product_id, supplier_id)
+                    
+                    # Validate and upsert in one statement on the server
+                    cursor.execute(self._PG_MERGE_SQL if self.dialect == 'postgresql' else self._MERGE_SQL)
+                    self.db_connection.commit()
+                    return True
+                except (OperationalError, DeadlockDetected) as e:
+                    deadlocked = isinstance(e, DeadlockDetected) or (e.args and e.args[0] == ER_LOCK_DEADLOCK)
+                    if deadlocked and attempt < MAX_DEADLOCK_RETRIES - 1:
+                        self.logger.warning("Deadlock detected, retrying... (attempt %d)", attempt + 1)
+                        self.db_connection.rollback()
+                        time.sleep(DEADLOCK_BACKOFF_SECONDS * 2 ** attempt)
+                        continue
+                    else:
+                        raise
             
         except Exception as e:
-            self.logger.error(f"Database operation failed: {e}")
+            self.logger.error("Database operation failed: %s", e)
             self.db_connection.rollback()
             return False
 
+class TestImprovedProductInventoryETL(unittest.TestCase):
+    def setUp(self):
+        self.fake_db = _FakeDB()
+        self.fake_cursor = self.fake_db.cursor()
+        self.etl = ImprovedProductInventoryETL(self.fake_db)
+    
+    def test_load_filters_invalid_products_in_sql(self):
+        # Rows the database reports as rejected after staging
+        self.fake_cursor.rows = [('PROD002', 'SUP999', 10), ('PROD003', 'SUP001', -5)]
+        
+        test_products = [
+            {'product_id': 'PROD001', 'quantity': 100, 'price': 29.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'},
+            {'product_id': 'PROD002', 'quantity': 10, 'price': 19.99, 'supplier_id': 'SUP999', 'last_updated': '2024-01-01T10:00:00'},
+            {'product_id': 'PROD003', 'quantity': -5, 'price': 9.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'}
+        ]
+        
+        with self.assertLogs(level='WARNING') as logs:
+            result = self.etl.load_to_database_improved(test_products)
+        
+        # Every row is staged in one batch, then merged by a single server-side statement
+        self.assertTrue(result)
+        self.assertEqual(self.fake_cursor.count('executemany'), 1)
+        self.assertEqual(self.fake_cursor.calls[2][2], test_products)
+        self.assertEqual(self.fake_cursor.calls[-1][1], ImprovedProductInventoryETL._MERGE_SQL)
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(self.fake_db.calls, ['commit'])
+    
+    def test_load_copies_rows_on_postgresql(self):
+        etl = ImprovedProductInventoryETL(self.fake_db, dialect='postgresql')
+        
+        test_products = [
+            {'product_id': 'PROD001', 'quantity': 100, 'price': 29.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'},
+            {'product_id': 'PROD002', 'quantity': 10, 'price': 19.99, 'supplier_id': 'SUP002', 'last_updated': '2024-01-01T10:00:00'}
+        ]
+        
+        result = etl.load_to_database_improved(test_products)
+        
+        # Rows travel in one COPY as CSV and are merged with ON CONFLICT, no executemany
+        self.assertTrue(result)
+        self.assertEqual(self.fake_cursor.count('copy_expert'), 1)
+        self.assertEqual(self.fake_cursor.count('executemany'), 0)
+        copied = [call for call in self.fake_cursor.calls if call[0] == 'copy_expert'][0][2]
+        self.assertEqual(copied.splitlines(), [
+            'PROD001,100,29.99,SUP001,2024-01-01T10:00:00',
+            'PROD002,10,19.99,SUP002,2024-01-01T10:00:00'
+        ])
+        self.assertEqual(self.fake_cursor.calls[-1][1], ImprovedProductInventoryETL._PG_MERGE_SQL)
+        self.assertEqual(self.fake_db.calls, ['commit'])
+    
+    def test_load_keeps_last_duplicate_product_on_postgresql(self):
+        etl = ImprovedProductInventoryETL(self.fake_db, dialect='postgresql')
+        
+        test_products = [
+            {'product_id': 'PROD001', 'quantity': 100, 'price': 29.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'},
+            {'product_id': 'PROD001', 'quantity': 80, 'price': 27.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'}
+        ]
+        
+        result = etl.load_to_database_improved(test_products)
+        
+        # Both rows are staged in feed order; the merge keeps one row per product
+        # (the latest staged) so ON CONFLICT never touches the same row twice
+        self.assertTrue(result)
+        executed = [call[1] for call in self.fake_cursor.calls if call[0] == 'execute']
+        self.assertIn("ALTER TABLE stg_inventory ADD COLUMN stg_seq BIGSERIAL", executed)
+        copied = [call for call in self.fake_cursor.calls if call[0] == 'copy_expert'][0][2]
+        self.assertEqual(copied.splitlines(), [
+            'PROD001,100,29.99,SUP001,2024-01-01T10:00:00',
+            'PROD001,80,27.99,SUP001,2024-01-01T10:00:00'
+        ])
+        merge_sql = self.fake_cursor.calls[-1][1]
+        self.assertIn("DISTINCT ON (s.product_id)", merge_sql)
+        self.assertIn("ORDER BY s.product_id, s.stg_seq DESC", merge_sql)
+        self.assertEqual(self.fake_db.calls, ['commit'])
+    
+    def test_dialect_detected_from_psycopg2_connection_only(self):
+        psycopg2_conn = type('connection', (), {'__module__': 'psycopg2.extensions'})()
+        psycopg3_conn = type('Connection', (), {'__module__': 'psycopg.connection'})()
+        
+        self.assertEqual(ImprovedProductInventoryETL(psycopg2_conn).dialect, 'postgresql')
+        self.assertEqual(ImprovedProductInventoryETL(psycopg3_conn).dialect, 'mysql')
+        self.assertEqual(self.etl.dialect, 'mysql')
+    
+    @patch('time.sleep')
+    def test_load_replays_transaction_after_deadlock(self, mock_sleep):
+        attempts = []
+        
+        def deadlock_once(sql, rows):
+            attempts.append(rows)
+            if len(attempts) == 1:
+                raise OperationalError(ER_LOCK_DEADLOCK, "Deadlock found when trying to get lock; try restarting transaction")
+        
+        self.fake_cursor.executemany_hook = deadlock_once
+        
+        test_products = [
+            {'product_id': f'PROD{i:04d}', 'quantity': 1, 'price': 9.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'}
+            for i in range(LOAD_BATCH_SIZE + 1)
+        ]
+        
+        result = self.etl.load_to_database_improved(test_products)
+        
+        # Rolled back once, then every batch was sent again and committed
+        self.assertTrue(result)
+        self.assertEqual(self.fake_db.calls, ['rollback', 'commit'])
+        self.assertEqual(len(attempts), 3)
+        mock_sleep.assert_called_once_with(DEADLOCK_BACKOFF_SECONDS)
+    
+    @patch('time.sleep')
+    def test_load_replays_generator_input_after_deadlock(self, mock_sleep):
+        staged = []
+        
+        def deadlock_once(sql, rows):
+            staged.append(list(rows))
+            if len(staged) == 1:
+                raise OperationalError(ER_LOCK_DEADLOCK, "Deadlock found when trying to get lock; try restarting transaction")
+        
+        self.fake_cursor.executemany_hook = deadlock_once
+        
+        test_products = [
+            {'product_id': 'PROD001', 'quantity': 100, 'price': 29.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'},
+            {'product_id': 'PROD002', 'quantity': 10, 'price': 19.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'}
+        ]
+        
+        result = self.etl.load_to_database_improved(product for product in test_products)
+        
+        # The replay stages the same rows again instead of an exhausted generator
+        self.assertTrue(result)
+        self.assertEqual(staged, [test_products, test_products])
+        self.assertEqual(self.fake_db.calls, ['rollback', 'commit'])
+    
+    @patch('time.sleep')
+    def test_load_does_not_retry_other_operational_errors(self, mock_sleep):
+        def lock_wait_timeout(sql, rows):
+            raise OperationalError(1205, "Lock wait timeout exceeded; try restarting transaction")
+        
+        self.fake_cursor.executemany_hook = lock_wait_timeout
+        
+        test_products = [
+            {'product_id': 'PROD001', 'quantity': 100, 'price': 29.99, 'supplier_id': 'SUP001', 'last_updated': '2024-01-01T10:00:00'}
+        ]
+        
+        result = self.etl.load_to_database_improved(test_products)
+        
+        self.assertFalse(result)
+        self.assertEqual(self.fake_db.calls, ['rollback'])
+        mock_sleep.assert_not_called()
+
 
 if __name__ == "__main__":
     demonstrate_unit_vs_integration_testing()
\ No newline at end of file